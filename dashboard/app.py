@@ -3,9 +3,8 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+from st_aggrid import AgGrid, DataReturnMode, GridUpdateMode
 from datetime import datetime
 
 # Set page configuration
@@ -16,26 +15,272 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Columns the dashboard actually uses; pushed down into the file read so
+# unused columns never leave disk
+DASHBOARD_COLUMNS = ['Invoice_ID', 'Customer_ID', 'Salesperson_ID', 'Invoice_Date',
+                     'Due_Date', 'Payment_Date', 'Amount_Billed', 'Amount_Received',
+                     'Discount', 'Leakage', 'Payment_Gap', 'Payment_Delay_Days', 'Discount_Percentage',
+                     'Region', 'Payment_Method', 'Payment_Status', 'Risk_Score',
+                     'Risk_Category', 'Leakage_Type', 'Is_Leaked', 'Invoice_Month']
+
 # Define functions for data loading and visualization
 @st.cache_data
 def load_data():
     """Load and cache the transaction data"""
     try:
-        data = pd.read_csv("data/processed/cleaned_transactions.csv")
-        # Convert date columns to datetime
-        date_cols = ['Invoice_Date', 'Due_Date', 'Payment_Date']
-        for col in date_cols:
+        parquet_path = "data/processed/cleaned_transactions.parquet"
+        if os.path.exists(parquet_path):
+            # Parquet round-trips dtypes (datetime, category, float), so no
+            # per-column conversion is needed after the read
+            data = pd.read_parquet(parquet_path, columns=DASHBOARD_COLUMNS)
+        else:
+            # The CSV fallback gets the same column push-down plus explicit
+            # dtypes, so the parser skips per-column type inference and the
+            # columns the dashboard never touches; parse_dates folds the
+            # datetime conversion into the read itself
+            csv_dtypes = {
+                'Payment_Delay_Days': 'float32', 'Discount_Percentage': 'float32',
+                'Risk_Score': 'float32', 'Is_Leaked': 'int8',
+                'Region': 'category', 'Payment_Method': 'category',
+                'Payment_Status': 'category', 'Risk_Category': 'category',
+                'Leakage_Type': 'category', 'Customer_ID': 'category',
+                'Salesperson_ID': 'category', 'Invoice_Month': 'category',
+            }
+            wanted = set(DASHBOARD_COLUMNS)
+            data = pd.read_csv("data/processed/cleaned_transactions.csv",
+                               usecols=lambda col: col in wanted,
+                               dtype=csv_dtypes,
+                               parse_dates=['Invoice_Date', 'Due_Date', 'Payment_Date'])
+            # Older CSV artifacts predate the stored Leakage column
+            if 'Leakage' not in data.columns:
+                data['Leakage'] = data['Amount_Billed'] - data['Amount_Received']
+        # Low-cardinality string columns become categoricals so groupbys and
+        # equality filters work on integer codes instead of Python strings
+        cat_cols = ['Region', 'Payment_Method', 'Leakage_Type',
+                    'Payment_Status', 'Customer_ID', 'Salesperson_ID', 'Invoice_Month']
+        for col in cat_cols:
             if col in data.columns:
-                data[col] = pd.to_datetime(data[col])
+                data[col] = data[col].astype('category')
+        data['Risk_Category'] = data['Risk_Category'].astype(RISK_ORDER)
+        # Invoice_ID is high-cardinality and only ever searched by substring;
+        # Arrow-backed strings dispatch .str.contains to pyarrow's C++ kernel
+        data['Invoice_ID'] = data['Invoice_ID'].astype('string[pyarrow]')
+        # Keep rows sorted by invoice date so the date-range filter can use
+        # binary search instead of scanning the whole column
+        data = data.sort_values('Invoice_Date').reset_index(drop=True)
+        # Force block consolidation so all columns of a dtype share one
+        # contiguous 2-D block; the column-wise sums and means behind every
+        # chart then stream through memory instead of hopping between the
+        # per-column buffers a columnar read can leave behind
+        data = data.copy()
         return data
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
+@st.cache_data
+def load_cube():
+    """Load the pre-aggregated transaction cube written by data_processing"""
+    cube_path = "data/processed/txn_cube.parquet"
+    if os.path.exists(cube_path):
+        cube = pd.read_parquet(cube_path)
+    else:
+        # Older artifacts predate the cube; build it from the row-level data
+        cube = load_data().groupby(
+            ['Invoice_Date', 'Invoice_Month', 'Region', 'Payment_Method',
+             'Risk_Category', 'Leakage_Type'],
+            observed=True, dropna=False).agg(
+            Count=('Invoice_ID', 'count'),
+            Amount_Billed=('Amount_Billed', 'sum'),
+            Amount_Received=('Amount_Received', 'sum'),
+            Leakage=('Leakage', 'sum')).reset_index()
+    return cube.sort_values('Invoice_Date').reset_index(drop=True)
+
+def _apply_sidebar_filters(frame, start_date, end_date, region, payment_method, risk, leakage_type):
+    """Shared filter kernel for the row-level frame and the cube"""
+    # Both frames are sorted by Invoice_Date, so the date range reduces to a
+    # binary search returning a zero-copy slice
+    dates = frame['Invoice_Date'].to_numpy()
+    lo = np.searchsorted(dates, np.datetime64(start_date))
+    hi = np.searchsorted(dates, np.datetime64(end_date) + np.timedelta64(1, 'D'))
+    filtered = frame.iloc[lo:hi]
+
+    mask = np.ones(len(filtered), dtype=bool)
+    if region != 'All':
+        mask &= (filtered['Region'] == region).to_numpy()
+    if payment_method != 'All':
+        mask &= (filtered['Payment_Method'] == payment_method).to_numpy()
+    if risk != 'All':
+        mask &= (filtered['Risk_Category'] == risk).to_numpy()
+    if leakage_type != 'All':
+        mask &= (filtered['Leakage_Type'] == leakage_type).to_numpy()
+    if not mask.all():
+        filtered = filtered[mask]
+    return filtered
+
+# The aggregation helpers below are cached on the filter scalars only; the
+# underscore prefix on the frame argument tells Streamlit not to hash it.
+@st.cache_data
+def filter_transactions(_df, start_date, end_date, region, payment_method, risk, leakage_type):
+    """Apply all sidebar filters in a single pass and cache the result"""
+    return _apply_sidebar_filters(_df, start_date, end_date, region,
+                                  payment_method, risk, leakage_type)
+
+@st.cache_data
+def filter_cube(_cube, start_date, end_date, region, payment_method, risk, leakage_type):
+    """Apply all sidebar filters to the pre-aggregated cube"""
+    return _apply_sidebar_filters(_cube, start_date, end_date, region,
+                                  payment_method, risk, leakage_type)
+
+@st.cache_data
+def monthly_trend(_cube, *filters):
+    """Monthly billed/received/leakage totals for the current filters"""
+    filtered = filter_cube(_cube, *filters)
+    monthly_data = filtered.groupby('Invoice_Month', observed=True).agg({
+        'Amount_Billed': 'sum',
+        'Amount_Received': 'sum',
+        'Leakage': 'sum'
+    }).reset_index()
+    return monthly_data
+
+@st.cache_data
+def region_leakage(_cube, *filters):
+    """Leakage totals by region for the current filters"""
+    filtered = filter_cube(_cube, *filters)
+    region_data = filtered.groupby('Region', observed=True).agg({
+        'Amount_Billed': 'sum',
+        'Leakage': 'sum'
+    }).reset_index()
+    region_data['Leakage_Percent'] = region_data['Leakage'] / region_data['Amount_Billed'] * 100
+    return region_data
+
+@st.cache_data
+def payment_method_leakage(_cube, *filters):
+    """Leakage totals by payment method for the current filters"""
+    filtered = filter_cube(_cube, *filters)
+    payment_data = filtered.groupby('Payment_Method', observed=True).agg({
+        'Leakage': 'sum'
+    }).reset_index()
+    return payment_data
+
+@st.cache_data
+def leakage_by_type(_cube, *filters):
+    """Leakage counts and amounts by leakage type for the current filters"""
+    filtered = filter_cube(_cube, *filters)
+    # Grouping on Leakage_Type drops the NaN (unleaked) rows, which is
+    # exactly the old Is_Leaked == 1 subset
+    leakage_data = filtered.groupby('Leakage_Type', observed=True).agg({
+        'Count': 'sum',
+        'Leakage': 'sum'
+    }).reset_index()
+    leakage_data.rename(columns={'Leakage': 'Leakage_Amount'}, inplace=True)
+    return leakage_data
+
+@st.cache_data
+def top_customer_leakage(_df, *filters):
+    """Top 10 customers by leakage amount for the current filters"""
+    filtered = filter_transactions(_df, *filters)
+    customer_leakage = filtered.groupby('Customer_ID', observed=True).agg({
+        'Amount_Billed': 'sum',
+        'Leakage': 'sum'
+    }).reset_index()
+    customer_leakage['Leakage_Percent'] = (customer_leakage['Leakage'] / customer_leakage['Amount_Billed'] * 100)
+    return customer_leakage.sort_values('Leakage', ascending=False).head(10)
+
+@st.cache_data
+def payment_delay_summary(_df, *filters):
+    """Bucket paid invoices by payment delay for the current filters"""
+    filtered = filter_transactions(_df, *filters)
+    # Bucket only the paid rows, and only the two columns the charts need —
+    # no full-frame copy just to attach a Delay_Category column. The bins
+    # are static, so binary search against the edge array replaces pd.cut's
+    # general-purpose binning machinery, and the resulting categorical is
+    # passed to groupby directly as the key.
+    paid = filtered['Payment_Date'].notna().to_numpy()
+    codes = np.searchsorted(DELAY_BINS, filtered['Payment_Delay_Days'].to_numpy()[paid], side='left')
+    delay_cat = pd.Categorical.from_codes(codes, DELAY_LABELS, ordered=True)
+    delay_summary = filtered.loc[paid, ['Invoice_ID', 'Amount_Billed']].groupby(
+        delay_cat, observed=True).agg({
+        'Invoice_ID': 'count',
+        'Amount_Billed': 'sum'
+    }).rename_axis('Delay_Category').reset_index()
+    delay_summary.rename(columns={'Invoice_ID': 'Count'}, inplace=True)
+    return delay_summary
+
+@st.cache_data
+def salesperson_leakage(_df, *filters):
+    """Per-salesperson leakage metrics for the current filters"""
+    filtered = filter_transactions(_df, *filters)
+    sp_leakage = filtered.groupby('Salesperson_ID', observed=True).agg({
+        'Invoice_ID': 'count',
+        'Is_Leaked': 'sum',
+        'Amount_Billed': 'sum',
+        'Leakage': 'sum'
+    }).reset_index()
+    sp_leakage['Leakage_Percent'] = (sp_leakage['Leakage'] / sp_leakage['Amount_Billed'] * 100)
+    sp_leakage['Leaked_Invoice_Percent'] = (sp_leakage['Is_Leaked'] / sp_leakage['Invoice_ID'] * 100)
+    return sp_leakage.sort_values('Leakage', ascending=False)
+
+@st.cache_data
+def risk_score_histogram(_df, *filters):
+    """Pre-binned Risk_Score histogram so only bin counts reach the browser"""
+    filtered = filter_transactions(_df, *filters)
+    edges = np.linspace(0, 100, 21)
+    centers = (edges[:-1] + edges[1:]) / 2
+    frames = []
+    for category in ['Low', 'Medium', 'High', 'Critical']:
+        scores = filtered.loc[filtered['Risk_Category'] == category, 'Risk_Score'].to_numpy()
+        counts, _ = np.histogram(scores, bins=edges)
+        frames.append(pd.DataFrame({'Risk_Score': centers, 'Count': counts,
+                                    'Risk_Category': category}))
+    return pd.concat(frames, ignore_index=True)
+
+@st.cache_data
+def risk_correlations(_df, *filters):
+    """Correlation matrix of the numeric risk factors for the current filters"""
+    filtered = filter_transactions(_df, *filters)
+    corr_cols = ['Payment_Delay_Days', 'Amount_Billed', 'Discount', 'Payment_Gap',
+                 'Discount_Percentage', 'Risk_Score']
+    arr = filtered[corr_cols].to_numpy(dtype=np.float64)
+    nan_cols = np.isnan(arr).any(axis=0)
+    if nan_cols.any():
+        # Match pandas' pairwise NaN handling in two BLAS calls: complete
+        # columns correlate over all rows, while the NaN-bearing ones
+        # (Payment_Delay_Days is NaN for missing payments) correlate over
+        # their observed rows
+        k = len(corr_cols)
+        corr = np.full((k, k), np.nan)
+        complete = ~nan_cols
+        corr[np.ix_(complete, complete)] = np.corrcoef(arr[:, complete], rowvar=False)
+        observed = ~np.isnan(arr).any(axis=1)
+        corr_observed = np.corrcoef(arr[observed], rowvar=False)
+        corr[nan_cols, :] = corr_observed[nan_cols, :]
+        corr[:, nan_cols] = corr_observed[:, nan_cols]
+    else:
+        corr = np.corrcoef(arr, rowvar=False)
+    return pd.DataFrame(corr, index=corr_cols, columns=corr_cols)
+
 def format_currency(amount):
     """Format numbers as currency"""
     return f"₹{amount:,.2f}"
 
+# Risk categories in ascending severity; the ordered dtype lets severity
+# filters compare category codes instead of strings
+RISK_ORDER = pd.CategoricalDtype(['Low', 'Medium', 'High', 'Critical'], ordered=True)
+
+# Payment delay buckets: right-inclusive bin edges and their labels
+DELAY_BINS = np.array([0, 15, 30, 60])
+DELAY_LABELS = ['On Time', '1-15 days', '16-30 days', '31-60 days', '60+ days']
+
+# Currency columns shown in tabular views; formatted via Styler.format,
+# which is vectorized, rather than a per-cell Python call
+CURRENCY_COLUMNS = ['Amount_Billed', 'Amount_Received', 'Discount', 'Leakage', 'Payment_Gap']
+
+def currency_style(frame):
+    """Apply currency formatting to whichever amount columns a frame has"""
+    return frame.style.format({col: '₹{:,.2f}' for col in CURRENCY_COLUMNS
+                               if col in frame.columns})
+
 # Load data
 df = load_data()
 
@@ -50,47 +295,47 @@ Detect missing payments, payment delays, over-discounts, and other leakage point
 st.sidebar.header("Filters")
 
 if df is not None:
-    # Date range filter
-    min_date = df['Invoice_Date'].min().date()
-    max_date = df['Invoice_Date'].max().date()
+    # Date range filter (df is sorted by Invoice_Date, so the bounds are the
+    # first and last rows — no full-column min/max scan per rerun)
+    min_date = df['Invoice_Date'].iloc[0].date()
+    max_date = df['Invoice_Date'].iloc[-1].date()
     date_range = st.sidebar.date_input(
         "Invoice Date Range",
         value=[min_date, max_date],
         min_value=min_date,
         max_value=max_date
     )
-    
+
     if len(date_range) == 2:
         start_date, end_date = date_range
-        filtered_df = df[(df['Invoice_Date'].dt.date >= start_date) & 
-                        (df['Invoice_Date'].dt.date <= end_date)]
     else:
-        filtered_df = df
-    
+        start_date, end_date = min_date, max_date
+
+    # The option lists come straight off the categoricals: categories are
+    # already sorted and stored, so no full-column unique() scan per rerun
     # Region filter
-    regions = ['All'] + sorted(df['Region'].unique().tolist())
+    regions = ['All'] + df['Region'].cat.categories.tolist()
     selected_region = st.sidebar.selectbox("Region", regions)
-    if selected_region != 'All':
-        filtered_df = filtered_df[filtered_df['Region'] == selected_region]
-    
+
     # Payment method filter
-    payment_methods = ['All'] + sorted(df['Payment_Method'].unique().tolist())
+    payment_methods = ['All'] + df['Payment_Method'].cat.categories.tolist()
     selected_payment_method = st.sidebar.selectbox("Payment Method", payment_methods)
-    if selected_payment_method != 'All':
-        filtered_df = filtered_df[filtered_df['Payment_Method'] == selected_payment_method]
-    
+
     # Risk category filter
     risk_cats = ['All', 'Critical', 'High', 'Medium', 'Low']
     selected_risk = st.sidebar.selectbox("Risk Category", risk_cats)
-    if selected_risk != 'All':
-        filtered_df = filtered_df[filtered_df['Risk_Category'] == selected_risk]
-    
-    # Leakage type filter
-    leakage_types = ['All'] + sorted([str(t) for t in df['Leakage_Type'].unique() if pd.notna(t)])
+
+    # Leakage type filter (NaN marks unleaked rows and is never a category)
+    leakage_types = ['All'] + df['Leakage_Type'].cat.categories.tolist()
     selected_leakage = st.sidebar.selectbox("Leakage Type", leakage_types)
-    if selected_leakage != 'All':
-        filtered_df = filtered_df[filtered_df['Leakage_Type'] == selected_leakage]
-    
+
+    # The filter tuple keys every cached aggregation below
+    filters = (start_date, end_date, selected_region, selected_payment_method,
+               selected_risk, selected_leakage)
+    filtered_df = filter_transactions(df, *filters)
+    # Small pre-aggregated cube backing the trend/region/payment/type charts
+    cube = load_cube()
+
     # Show data summary based on filters
     st.sidebar.markdown("---")
     st.sidebar.subheader("Filtered Data Summary")
@@ -98,40 +343,38 @@ if df is not None:
     st.sidebar.write(f"Customers: {filtered_df['Customer_ID'].nunique()}")
     st.sidebar.write(f"Total Billed: {format_currency(filtered_df['Amount_Billed'].sum())}")
     st.sidebar.write(f"Total Received: {format_currency(filtered_df['Amount_Received'].sum())}")
-    
+
     # Main dashboard tabs
     tab1, tab2, tab3, tab4 = st.tabs(["Executive Summary", "Leakage Analysis", "Risk Assessment", "Transaction Details"])
-    
+
     with tab1:
         st.header("Executive Summary")
-        
+
         # Key metrics in a row
         col1, col2, col3, col4 = st.columns(4)
-        
+
         total_billed = filtered_df['Amount_Billed'].sum()
         total_received = filtered_df['Amount_Received'].sum()
         total_leakage = total_billed - total_received
         leakage_percent = (total_leakage / total_billed * 100) if total_billed > 0 else 0
-        
+
         col1.metric("Total Billed", format_currency(total_billed))
         col2.metric("Total Received", format_currency(total_received))
         col3.metric("Total Leakage", format_currency(total_leakage))
         col4.metric("Leakage %", f"{leakage_percent:.2f}%")
-        
+
         # Monthly trend chart
         st.subheader("Monthly Revenue Trend")
-        monthly_data = filtered_df.groupby('Invoice_Month').agg({
-            'Amount_Billed': 'sum',
-            'Amount_Received': 'sum'
-        }).reset_index()
-        monthly_data['Leakage'] = monthly_data['Amount_Billed'] - monthly_data['Amount_Received']
-        
+        monthly_data = monthly_trend(cube, *filters)
+
+        # Scattergl renders via WebGL, so wide date ranges don't bog down the
+        # browser with SVG nodes
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=monthly_data['Invoice_Month'], y=monthly_data['Amount_Billed'], 
+        fig.add_trace(go.Scattergl(x=monthly_data['Invoice_Month'], y=monthly_data['Amount_Billed'],
                                 name='Billed', line=dict(color='blue')))
-        fig.add_trace(go.Scatter(x=monthly_data['Invoice_Month'], y=monthly_data['Amount_Received'], 
+        fig.add_trace(go.Scattergl(x=monthly_data['Invoice_Month'], y=monthly_data['Amount_Received'],
                                 name='Received', line=dict(color='green')))
-        fig.add_trace(go.Bar(x=monthly_data['Invoice_Month'], y=monthly_data['Leakage'], 
+        fig.add_trace(go.Bar(x=monthly_data['Invoice_Month'], y=monthly_data['Leakage'],
                             name='Leakage', marker_color='red'))
         fig.update_layout(
             title='Monthly Revenue and Leakage',
@@ -140,19 +383,14 @@ if df is not None:
             legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
         )
         st.plotly_chart(fig, use_container_width=True)
-        
+
         # Regional distribution
         col1, col2 = st.columns(2)
-        
+
         with col1:
             st.subheader("Leakage by Region")
-            region_data = filtered_df.groupby('Region').agg({
-                'Amount_Billed': 'sum',
-                'Amount_Received': 'sum'
-            }).reset_index()
-            region_data['Leakage'] = region_data['Amount_Billed'] - region_data['Amount_Received']
-            region_data['Leakage_Percent'] = region_data['Leakage'] / region_data['Amount_Billed'] * 100
-            
+            region_data = region_leakage(cube, *filters)
+
             fig = px.bar(region_data, x='Region', y='Leakage',
                         text_auto='.2s',
                         color='Leakage_Percent',
@@ -160,231 +398,195 @@ if df is not None:
                         labels={'Leakage': 'Revenue Leakage (₹)', 'Region': 'Region'})
             fig.update_layout(title='Leakage Amount by Region')
             st.plotly_chart(fig, use_container_width=True)
-        
+
         with col2:
             st.subheader("Leakage by Payment Method")
-            payment_data = filtered_df.groupby('Payment_Method').agg({
-                'Amount_Billed': 'sum',
-                'Amount_Received': 'sum'
-            }).reset_index()
-            payment_data['Leakage'] = payment_data['Amount_Billed'] - payment_data['Amount_Received']
-            payment_data['Leakage_Percent'] = payment_data['Leakage'] / payment_data['Amount_Billed'] * 100
-            
+            payment_data = payment_method_leakage(cube, *filters)
+
             fig = px.pie(payment_data, values='Leakage', names='Payment_Method',
                         hole=0.4,
                         color_discrete_sequence=px.colors.qualitative.Set2)
             fig.update_layout(title='Leakage Distribution by Payment Method')
             st.plotly_chart(fig, use_container_width=True)
-    
+
     with tab2:
         st.header("Leakage Analysis")
-        
+
         col1, col2 = st.columns(2)
-        
+
         with col1:
             st.subheader("Leakage by Type")
-            # Aggregate leakage by type
-            leakage_by_type = filtered_df[filtered_df['Is_Leaked'] == 1].groupby('Leakage_Type').agg({
-                'Invoice_ID': 'count',
-                'Amount_Billed': 'sum',
-                'Amount_Received': 'sum'
-            }).reset_index()
-            leakage_by_type['Leakage_Amount'] = leakage_by_type['Amount_Billed'] - leakage_by_type['Amount_Received']
-            leakage_by_type.rename(columns={'Invoice_ID': 'Count'}, inplace=True)
-            
+            leakage_data = leakage_by_type(cube, *filters)
+
             # Create a horizontal bar chart
-            fig = px.bar(leakage_by_type, y='Leakage_Type', x='Leakage_Amount',
+            fig = px.bar(leakage_data, y='Leakage_Type', x='Leakage_Amount',
                         color='Count',
                         color_continuous_scale='Viridis',
                         orientation='h',
-                        labels={'Leakage_Amount': 'Leakage Amount (₹)', 
+                        labels={'Leakage_Amount': 'Leakage Amount (₹)',
                                'Leakage_Type': 'Type of Leakage',
                                'Count': 'Number of Cases'})
             fig.update_layout(title='Revenue Leakage by Type')
             st.plotly_chart(fig, use_container_width=True)
-            
+
         with col2:
             st.subheader("Top 10 Customers with Leakage")
-            # Get top customers by leakage amount
-            customer_leakage = filtered_df.groupby('Customer_ID').agg({
-                'Invoice_ID': 'count',
-                'Amount_Billed': 'sum',
-                'Amount_Received': 'sum'
-            }).reset_index()
-            customer_leakage['Leakage'] = customer_leakage['Amount_Billed'] - customer_leakage['Amount_Received']
-            customer_leakage['Leakage_Percent'] = (customer_leakage['Leakage'] / customer_leakage['Amount_Billed'] * 100)
-            customer_leakage = customer_leakage.sort_values('Leakage', ascending=False).head(10)
-            
+            customer_leakage = top_customer_leakage(df, *filters)
+
             # Create bar chart
             fig = px.bar(customer_leakage, x='Customer_ID', y='Leakage',
                         color='Leakage_Percent',
                         color_continuous_scale='Reds',
                         text_auto='.2s',
-                        labels={'Leakage': 'Amount Leaked (₹)', 
-                               'Customer_ID': 'Customer', 
+                        labels={'Leakage': 'Amount Leaked (₹)',
+                               'Customer_ID': 'Customer',
                                'Leakage_Percent': 'Leakage %'})
             fig.update_layout(title='Top 10 Customers by Leakage Amount')
             st.plotly_chart(fig, use_container_width=True)
-        
+
         # Payment delay analysis
         st.subheader("Payment Delay Analysis")
-        delay_df = filtered_df[filtered_df['Payment_Date'].notna()].copy()
-        delay_df['Delay_Category'] = pd.cut(
-            delay_df['Payment_Delay_Days'], 
-            bins=[-float('inf'), 0, 15, 30, 60, float('inf')],
-            labels=['On Time', '1-15 days', '16-30 days', '31-60 days', '60+ days']
-        )
-        
-        delay_summary = delay_df.groupby('Delay_Category').agg({
-            'Invoice_ID': 'count',
-            'Amount_Billed': 'sum'
-        }).reset_index()
-        delay_summary.rename(columns={'Invoice_ID': 'Count'}, inplace=True)
-        
+        delay_summary = payment_delay_summary(df, *filters)
+
         col1, col2 = st.columns(2)
-        
+
         with col1:
             fig = px.pie(delay_summary, values='Count', names='Delay_Category',
                         color_discrete_sequence=px.colors.sequential.Plasma_r,
                         hole=0.3)
             fig.update_layout(title='Payment Delay Distribution (Count)')
             st.plotly_chart(fig, use_container_width=True)
-        
+
         with col2:
             fig = px.pie(delay_summary, values='Amount_Billed', names='Delay_Category',
                         color_discrete_sequence=px.colors.sequential.Plasma_r,
                         hole=0.3)
             fig.update_layout(title='Payment Delay Distribution (Amount)')
             st.plotly_chart(fig, use_container_width=True)
-        
+
         # Salesperson leakage
         st.subheader("Leakage by Salesperson")
-        sp_leakage = filtered_df.groupby('Salesperson_ID').agg({
-            'Invoice_ID': 'count',
-            'Is_Leaked': 'sum',
-            'Amount_Billed': 'sum',
-            'Amount_Received': 'sum'
-        }).reset_index()
-        sp_leakage['Leakage'] = sp_leakage['Amount_Billed'] - sp_leakage['Amount_Received']
-        sp_leakage['Leakage_Percent'] = (sp_leakage['Leakage'] / sp_leakage['Amount_Billed'] * 100)
-        sp_leakage['Leaked_Invoice_Percent'] = (sp_leakage['Is_Leaked'] / sp_leakage['Invoice_ID'] * 100)
-        sp_leakage = sp_leakage.sort_values('Leakage', ascending=False)
-        
+        sp_leakage = salesperson_leakage(df, *filters)
+
         fig = px.scatter(sp_leakage, x='Leaked_Invoice_Percent', y='Leakage_Percent',
                         size='Amount_Billed', color='Leakage',
                         hover_name='Salesperson_ID',
+                        render_mode='webgl',
                         labels={'Leaked_Invoice_Percent': '% of Invoices with Leakage',
                                'Leakage_Percent': '% of Revenue Leaked',
                                'Amount_Billed': 'Total Billed Amount'},
                         color_continuous_scale='Reds')
         fig.update_layout(title='Salesperson Risk Analysis')
         st.plotly_chart(fig, use_container_width=True)
-    
+
     with tab3:
         st.header("Risk Assessment")
-        
+
         # Risk distribution
         st.subheader("Risk Score Distribution")
-        
+
         col1, col2 = st.columns(2)
-        
+
         with col1:
-            fig = px.histogram(filtered_df, x='Risk_Score',
-                             color='Risk_Category',
-                             color_discrete_map={
-                                 'Low': 'green',
-                                 'Medium': 'yellow',
-                                 'High': 'orange',
-                                 'Critical': 'red'
-                             },
-                             nbins=20,
-                             labels={'Risk_Score': 'Risk Score (0-100)'})
-            fig.update_layout(title='Distribution of Risk Scores')
+            # Bins are computed server-side so only 20 bars per category are
+            # shipped to the browser instead of every raw score
+            hist_data = risk_score_histogram(df, *filters)
+            fig = px.bar(hist_data, x='Risk_Score', y='Count',
+                        color='Risk_Category',
+                        color_discrete_map={
+                            'Low': 'green',
+                            'Medium': 'yellow',
+                            'High': 'orange',
+                            'Critical': 'red'
+                        },
+                        labels={'Risk_Score': 'Risk Score (0-100)'})
+            fig.update_layout(title='Distribution of Risk Scores', bargap=0)
             st.plotly_chart(fig, use_container_width=True)
-        
+
         with col2:
             risk_count = filtered_df['Risk_Category'].value_counts().reset_index()
             risk_count.columns = ['Risk_Category', 'Count']
-            
+
             # Ensure all categories are present
             all_cats = pd.DataFrame({'Risk_Category': ['Low', 'Medium', 'High', 'Critical']})
             risk_count = pd.merge(all_cats, risk_count, on='Risk_Category', how='left').fillna(0)
-            
+
             # Create a custom color sequence
             color_map = {'Low': 'green', 'Medium': 'gold', 'High': 'orange', 'Critical': 'red'}
             color_seq = [color_map[cat] for cat in risk_count['Risk_Category']]
-            
+
             fig = px.pie(risk_count, values='Count', names='Risk_Category',
                         color='Risk_Category',
                         color_discrete_map=color_map)
             fig.update_layout(title='Distribution of Risk Categories')
             st.plotly_chart(fig, use_container_width=True)
-        
+
         # High risk invoices
         st.subheader("Critical and High Risk Invoices")
-        high_risk_df = filtered_df[filtered_df['Risk_Category'].isin(['Critical', 'High'])].sort_values('Risk_Score', ascending=False)
+        # Risk_Category is ordered, so "High or Critical" is a single
+        # vectorized compare on the int8 category codes (NaN codes are -1
+        # and fall out naturally)
+        high_code = RISK_ORDER.categories.get_loc('High')
+        high_risk_mask = filtered_df['Risk_Category'].cat.codes.to_numpy() >= high_code
+        high_risk_df = filtered_df[high_risk_mask].sort_values('Risk_Score', ascending=False)
         if not high_risk_df.empty:
             display_cols = ['Invoice_ID', 'Customer_ID', 'Invoice_Date', 'Due_Date', 'Payment_Date',
                            'Amount_Billed', 'Amount_Received', 'Payment_Gap', 'Payment_Delay_Days',
                            'Leakage_Type', 'Risk_Score', 'Risk_Category']
-            st.dataframe(high_risk_df[display_cols], use_container_width=True)
+            st.dataframe(currency_style(high_risk_df[display_cols]), use_container_width=True)
         else:
             st.info("No high-risk invoices found in the selected filters.")
-        
+
         # Risk factors correlation
         st.subheader("Risk Factors Analysis")
-        
-        # Select numerical columns that might be correlated with risk
-        corr_cols = ['Payment_Delay_Days', 'Amount_Billed', 'Discount', 'Payment_Gap', 
-                     'Discount_Percentage', 'Risk_Score']
-        
-        # Calculate correlation matrix for these columns
-        corr_matrix = filtered_df[corr_cols].corr()
-        
-        # Create a heatmap
-        fig, ax = plt.subplots(figsize=(10, 8))
-        mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
-        sns.heatmap(corr_matrix, mask=mask, cmap='coolwarm', vmax=1, vmin=-1, center=0,
-                   annot=True, fmt=".2f", square=True, linewidths=.5, ax=ax)
-        plt.title('Correlation Between Risk Factors')
-        st.pyplot(fig)
-    
+
+        # Calculate correlation matrix for the numeric risk factors
+        corr_matrix = risk_correlations(df, *filters)
+
+        # Create a heatmap (Plotly reuses the figure client-side, unlike the
+        # old matplotlib/seaborn PNG that was re-rendered on every rerun)
+        fig = px.imshow(corr_matrix,
+                        color_continuous_scale='RdBu_r',
+                        zmin=-1, zmax=1,
+                        text_auto='.2f')
+        fig.update_layout(title='Correlation Between Risk Factors')
+        st.plotly_chart(fig, use_container_width=True)
+
     with tab4:
         st.header("Transaction Details")
-        
+
         # Search functionality
         search_col1, search_col2 = st.columns([1, 3])
         with search_col1:
             search_type = st.selectbox("Search by", ["Invoice ID", "Customer ID"])
-        
+
         with search_col2:
             if search_type == "Invoice ID":
                 search_term = st.text_input("Enter Invoice ID", "")
                 if search_term:
-                    search_results = filtered_df[filtered_df['Invoice_ID'].str.contains(search_term, case=False)]
+                    search_results = filtered_df[filtered_df['Invoice_ID'].str.contains(search_term, case=False, regex=False)]
             else:  # Customer ID
                 search_term = st.text_input("Enter Customer ID", "")
                 if search_term:
-                    search_results = filtered_df[filtered_df['Customer_ID'].str.contains(search_term, case=False)]
-                    
+                    search_results = filtered_df[filtered_df['Customer_ID'].str.contains(search_term, case=False, regex=False)]
+
             if search_term:
                 if not search_results.empty:
                     st.write(f"Found {len(search_results)} matching records")
-                    st.dataframe(search_results, use_container_width=True)
+                    st.dataframe(currency_style(search_results), use_container_width=True)
                 else:
                     st.warning("No matching records found.")
-        
-        # Complete transaction data with pagination
+
+        # Complete transaction data in a virtualized grid: AgGrid streams
+        # only the visible rows to the browser, so no manual pagination or
+        # per-page reslicing is needed
         st.subheader("All Transactions")
-        page_size = st.selectbox("Rows per page", [10, 20, 50, 100])
-        total_pages = (len(filtered_df) - 1) // page_size + 1
-        page_num = st.slider("Page", 1, total_pages, 1)
-        
-        start_idx = (page_num - 1) * page_size
-        end_idx = min(start_idx + page_size, len(filtered_df))
-        
-        st.dataframe(filtered_df.iloc[start_idx:end_idx], use_container_width=True)
-        st.write(f"Showing records {start_idx+1} to {end_idx} of {len(filtered_df)}")
-        
+        AgGrid(filtered_df,
+               key='txn-grid',
+               update_mode=GridUpdateMode.NO_UPDATE,
+               data_return_mode=DataReturnMode.FILTERED_AND_SORTED,
+               enable_enterprise_modules=False)
+        st.write(f"Showing {len(filtered_df)} records")
+
 else:
-    st.error("Failed to load transaction data. Please check if the data file exists and is valid.") 
\ No newline at end of file
+    st.error("Failed to load transaction data. Please check if the data file exists and is valid.")